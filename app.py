@@ -4,9 +4,10 @@ A lightweight FastAPI service to extract YouTube video transcripts
 """
 
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal, Union
+from functools import lru_cache
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
     TranscriptsDisabled,
@@ -15,20 +16,43 @@ from youtube_transcript_api._errors import (
     InvalidVideoId
 )
 from youtube_transcript_api.proxies import WebshareProxyConfig
+from cachetools import TTLCache
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+import queue
+import threading
+
+# Configure logging (level via LOG_LEVEL, default: warning)
+# Records go through a queue and are written to stderr by a background thread,
+# so request handlers never block on log I/O
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "warning").upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="YouTube Transcript Service",
     description="Microservice for extracting YouTube video transcripts",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Batch endpoint limits: videos per request and per-request fan-out
+MAX_BATCH_SIZE = 50
+MAX_BATCH_CONCURRENCY = 10
+
 # Request/Response Models
 class TranscriptRequest(BaseModel):
     video_id: str
@@ -41,11 +65,17 @@ class TranscriptSegment(BaseModel):
     duration: float
 
 
+class RawSegmentsSoA(BaseModel):
+    text: List[str]
+    start: List[float]
+    duration: List[float]
+
+
 class DetailedTranscriptResponse(BaseModel):
     success: bool
     videoId: str
     transcript: Optional[str]
-    raw: Optional[List[TranscriptSegment]]
+    raw: Optional[Union[List[TranscriptSegment], RawSegmentsSoA]]
     language: Optional[str]
 
 
@@ -71,40 +101,169 @@ class TimestampedTranscriptResponse(BaseModel):
     language: Optional[str]
 
 
-# Proxy configuration (optional - set via environment variables)
-PROXY_USERNAME = os.getenv("WEBSHARE_PROXY_USERNAME", "")
-PROXY_PASSWORD = os.getenv("WEBSHARE_PROXY_PASSWORD", "")
-PROXY_LOCATIONS = os.getenv("PROXY_LOCATIONS", "")  # Comma-separated country codes like "us,de"
+class BatchTranscriptRequest(BaseModel):
+    video_ids: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
+    language: Optional[str] = "en"
+    concurrency: int = Field(5, ge=1, le=MAX_BATCH_CONCURRENCY)
+
+
+class BatchTranscriptItem(BaseModel):
+    success: bool
+    videoId: str
+    transcript: Optional[str]
+    hasTranscript: bool
+    error: Optional[str] = None
+
+
+class BatchTranscriptResponse(BaseModel):
+    success: bool
+    results: List[BatchTranscriptItem]
+    language: Optional[str]
+
+
+# Proxy configuration (optional - set via environment variables):
+#   WEBSHARE_PROXY_USERNAME / WEBSHARE_PROXY_PASSWORD - Webshare credentials
+#   PROXY_LOCATIONS - Comma-separated country codes like "us,de"
+# These are read once, when the shared API instance is built.
+
+# Shared API instance, built on first use so its requests.Session keeps
+# connections to YouTube alive across requests
+_CACHED_API: Optional[YouTubeTranscriptApi] = None
+_API_LOCK = threading.Lock()
+
+# Transcript cache (optional tuning via environment variables)
+# Successful results are cached per (video_id, language); failures are not cached
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "2048"))
+TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", "86400"))  # Seconds
+_TRANSCRIPT_CACHE = TTLCache(maxsize=TRANSCRIPT_CACHE_SIZE, ttl=TRANSCRIPT_CACHE_TTL)
+_CACHE_LOCK = threading.Lock()
+_CACHE_STATS = {"hits": 0, "misses": 0}
+
+# Maximum number of concurrent outbound fetches to YouTube across all requests in
+# this worker process (each uvicorn worker has its own limit).
+# The HTTP connection pool is sized to match (proxied or not) so fetches never wait on the pool.
+YT_CONCURRENCY = int(os.getenv("YT_CONCURRENCY", "10"))
+_YT_SEMAPHORE = asyncio.Semaphore(YT_CONCURRENCY)
 
 
 def get_api_instance():
+    """
+    Return the shared YouTubeTranscriptApi instance, creating it on first use
+    """
+    global _CACHED_API
+    if _CACHED_API is None:
+        # Extraction runs in worker threads; make sure only one instance
+        # (and one connection pool) is ever created
+        with _API_LOCK:
+            if _CACHED_API is None:
+                _CACHED_API = build_api_instance()
+    return _CACHED_API
+
+
+def parse_proxy_locations(raw: str) -> Optional[List[str]]:
+    """
+    Parse a comma-separated country code list into normalized codes
+    
+    Args:
+        raw: Value like "US, de,gb"
+    
+    Returns:
+        List of lowercase country codes, or None if no codes are given
+    """
+    locations = [loc.strip().lower() for loc in raw.split(",") if loc.strip()]
+    return locations or None
+
+
+def mount_http_adapter(session: Session, retries_when_blocked: int = 0) -> None:
+    """
+    Mount an HTTPAdapter with a connection pool sized to YT_CONCURRENCY on session
+    
+    Args:
+        session: Session to mount the adapter on (for http:// and https://)
+        retries_when_blocked: Times to retry a request YouTube answers with 429 (0 disables retries)
+    """
+    max_retries = Retry(total=retries_when_blocked, status_forcelist=[429]) if retries_when_blocked > 0 else 0
+    adapter = HTTPAdapter(pool_maxsize=YT_CONCURRENCY, max_retries=max_retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def build_http_session() -> Session:
+    """
+    Create the requests.Session used for YouTube, with a connection pool sized to YT_CONCURRENCY
+    """
+    session = Session()
+    mount_http_adapter(session)
+    return session
+
+
+def build_api_instance():
     """
     Create YouTubeTranscriptApi instance with optional proxy configuration
     """
+    proxy_username = os.getenv("WEBSHARE_PROXY_USERNAME", "")
+    proxy_password = os.getenv("WEBSHARE_PROXY_PASSWORD", "")
+    
     # Check if Webshare proxy credentials are provided
-    if PROXY_USERNAME and PROXY_PASSWORD:
+    if proxy_username and proxy_password:
         logger.info("Using Webshare rotating residential proxies")
         
         # Parse location filter if provided
-        filter_locations = None
-        if PROXY_LOCATIONS:
-            filter_locations = [loc.strip().lower() for loc in PROXY_LOCATIONS.split(",")]
-            logger.info(f"Filtering proxy IPs to locations: {filter_locations}")
+        filter_locations = parse_proxy_locations(os.getenv("PROXY_LOCATIONS", ""))
+        if filter_locations:
+            logger.info("Filtering proxy IPs to locations: %s", filter_locations)
         
         # Create proxy config
         proxy_config = WebshareProxyConfig(
-            proxy_username=PROXY_USERNAME,
-            proxy_password=PROXY_PASSWORD,
-            filter_ip_locations=filter_locations if filter_locations else None
+            proxy_username=proxy_username,
+            proxy_password=proxy_password,
+            filter_ip_locations=filter_locations
         )
         
-        return YouTubeTranscriptApi(proxy_config=proxy_config)
+        session = build_http_session()
+        api = YouTubeTranscriptApi(proxy_config=proxy_config, http_client=session)
+        # The library mounts its own default-sized retry adapter when the proxy retries on
+        # blocks; re-mount one that keeps those retries and our pool size
+        mount_http_adapter(session, proxy_config.retries_when_blocked)
+        return api
     else:
         logger.info("Using direct connection (no proxy)")
-        return YouTubeTranscriptApi()
+        return YouTubeTranscriptApi(http_client=build_http_session())
 
 
 # Helper Functions
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Return transcript cache statistics
+    
+    Returns:
+        Dictionary with hits, misses, current size, max size and TTL
+    """
+    with _CACHE_LOCK:
+        return {
+            "hits": _CACHE_STATS["hits"],
+            "misses": _CACHE_STATS["misses"],
+            "size": len(_TRANSCRIPT_CACHE),
+            "maxsize": int(_TRANSCRIPT_CACHE.maxsize),
+            "ttl": int(_TRANSCRIPT_CACHE.ttl)
+        }
+
+
+def clear_transcript_cache() -> int:
+    """
+    Remove all cached transcripts and reset statistics
+    
+    Returns:
+        Number of entries removed
+    """
+    with _CACHE_LOCK:
+        cleared = len(_TRANSCRIPT_CACHE)
+        _TRANSCRIPT_CACHE.clear()
+        _CACHE_STATS["hits"] = 0
+        _CACHE_STATS["misses"] = 0
+    return cleared
+
+
 def format_timestamp(seconds: float) -> str:
     """
     Convert seconds to HH:MM:SS.mmm format
@@ -115,6 +274,13 @@ def format_timestamp(seconds: float) -> str:
     Returns:
         Formatted timestamp string
     """
+    # Segment boundaries repeat (one segment's end is often the next one's start),
+    # so round to millisecond precision and reuse previously formatted values
+    return _format_timestamp_ms(round(seconds, 3))
+
+
+@lru_cache(maxsize=4096)
+def _format_timestamp_ms(seconds: float) -> str:
     hours = int(seconds // 3600)
     minutes = int((seconds % 3600) // 60)
     secs = seconds % 60
@@ -122,40 +288,148 @@ def format_timestamp(seconds: float) -> str:
     return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
 
 
-def extract_transcript(video_id: str, language: str = "en") -> tuple[bool, Optional[str], Optional[List[Dict[str, Any]]]]:
+def build_timestamped_segments(raw_segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convert raw segments into timestamped segments with formatted start/end times
+    
+    Args:
+        raw_segments: Segments with text, start and duration
+    
+    Returns:
+        List of dicts with text, start, end, startFormatted and endFormatted
+    """
+    # Pull the numeric columns out once, then format them with C-level map()
+    # over the memoised formatter instead of per-segment attribute lookups
+    starts = [seg["start"] for seg in raw_segments]
+    ends = [start + seg["duration"] for start, seg in zip(starts, raw_segments)]
+    
+    return [
+        {
+            "text": seg["text"],
+            "start": start,
+            "end": end,
+            "startFormatted": start_formatted,
+            "endFormatted": end_formatted
+        }
+        for seg, start, end, start_formatted, end_formatted in zip(
+            raw_segments,
+            starts,
+            ends,
+            map(format_timestamp, starts),
+            map(format_timestamp, ends)
+        )
+    ]
+
+
+def _cached_transcript(video_id: str, language: str, need_raw: bool, count_miss: bool = True) -> Optional[tuple[bool, Optional[str], Optional[List[Dict[str, Any]]]]]:
+    """
+    Look up a transcript in the cache without fetching
+    
+    Args:
+        video_id: YouTube video ID
+        language: Language code
+        need_raw: Whether raw segments are needed (see extract_transcript)
+        count_miss: Whether a miss is recorded in the cache statistics
+    
+    Returns:
+        Tuple of (True, transcript_text, raw_segments) on a hit, None on a miss
+    """
+    with _CACHE_LOCK:
+        cached = _TRANSCRIPT_CACHE.get((video_id, language))
+        # A text-only entry cannot serve a request that needs raw segments
+        if cached is not None and need_raw and cached[1] is None:
+            cached = None
+        if cached is not None:
+            _CACHE_STATS["hits"] += 1
+        elif count_miss:
+            _CACHE_STATS["misses"] += 1
+    
+    if cached is None:
+        return None
+    return True, cached[0], cached[1] if need_raw else None
+
+
+def extract_transcript(video_id: str, language: str = "en", need_raw: bool = True) -> tuple[bool, Optional[str], Optional[List[Dict[str, Any]]]]:
     """
     Extract transcript from YouTube video
     
     Args:
         video_id: YouTube video ID
         language: Language code (default: "en")
+        need_raw: Whether raw segments are needed; when False only the text is
+            built and raw_segments is returned as None
     
     Returns:
         Tuple of (success, transcript_text, raw_segments)
     """
+    cached = _cached_transcript(video_id, language, need_raw)
+    if cached is not None:
+        return cached
+    
     try:
-        # Create API instance with optional proxy support
+        # Reuse the shared API instance (optional proxy support)
         api = get_api_instance()
         fetched_transcript = api.fetch(video_id, languages=[language])
         
-        # Extract the transcript list from the FetchedTranscript object
-        transcript_list = fetched_transcript.to_raw_data()
+        if need_raw:
+            # Extract the transcript list from the FetchedTranscript object
+            transcript_list = fetched_transcript.to_raw_data()
+            
+            # Combine text segments
+            transcript_text = " ".join(segment["text"] for segment in transcript_list)
+        else:
+            # Read text straight from the snippets without building the list of dicts
+            transcript_list = None
+            transcript_text = " ".join(snippet.text for snippet in fetched_transcript)
         
-        # Combine text segments
-        transcript_text = " ".join([segment["text"] for segment in transcript_list])
+        with _CACHE_LOCK:
+            _TRANSCRIPT_CACHE[(video_id, language)] = (transcript_text, transcript_list)
         
         return True, transcript_text, transcript_list
     
     except (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable, InvalidVideoId) as e:
-        logger.warning(f"Could not fetch transcript for video {video_id}: {str(e)}")
+        logger.warning("Could not fetch transcript for video %s: %s", video_id, e)
         return False, None, None
     
     except Exception as e:
         # Catch all other exceptions (including XML parsing errors from YouTube API)
-        logger.warning(f"Error fetching transcript for video {video_id}: {str(e)}")
+        logger.warning("Error fetching transcript for video %s: %s", video_id, e)
         return False, None, None
 
 
+async def extract_transcript_async(video_id: str, language: str = "en", need_raw: bool = True) -> tuple[bool, Optional[str], Optional[List[Dict[str, Any]]]]:
+    """
+    Run extract_transcript in a worker thread so the event loop is not blocked
+    
+    Cache hits are answered on the event loop; only misses wait for one of the
+    YT_CONCURRENCY fetch slots, to stay under YouTube/proxy rate limits
+    
+    Args:
+        video_id: YouTube video ID
+        language: Language code (default: "en")
+        need_raw: Whether raw segments are needed (see extract_transcript)
+    
+    Returns:
+        Tuple of (success, transcript_text, raw_segments)
+    """
+    # The miss is counted by extract_transcript, which checks the cache again in case
+    # another request stored this transcript while we waited for a slot
+    cached = _cached_transcript(video_id, language, need_raw, count_miss=False)
+    if cached is not None:
+        return cached
+    
+    async with _YT_SEMAPHORE:
+        return await asyncio.to_thread(extract_transcript, video_id, language, need_raw)
+
+
+async def _extract_bounded(semaphore: asyncio.Semaphore, video_id: str, language: str) -> tuple[bool, Optional[str], Optional[List[Dict[str, Any]]]]:
+    """
+    Extract a transcript while holding a slot of the given semaphore
+    """
+    async with semaphore:
+        return await extract_transcript_async(video_id, language, need_raw=False)
+
+
 # API Endpoints
 
 @app.get("/health")
@@ -181,7 +455,7 @@ async def get_transcript_simple(
     Returns:
         Simple transcript response with combined text
     """
-    success, transcript_text, _ = extract_transcript(video_id, lang)
+    success, transcript_text, _ = await extract_transcript_async(video_id, lang, need_raw=False)
     
     if success:
         return SimpleTranscriptResponse(
@@ -191,7 +465,7 @@ async def get_transcript_simple(
             hasTranscript=True
         )
     else:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={
                 "success": False,
@@ -203,41 +477,54 @@ async def get_transcript_simple(
 
 
 @app.post("/transcript", response_model=DetailedTranscriptResponse)
-async def get_transcript_detailed(request: TranscriptRequest):
+async def get_transcript_detailed(
+    request: TranscriptRequest,
+    raw_format: Literal["aos", "soa"] = Query(
+        "aos",
+        alias="format",
+        description="Layout of raw segments: 'aos' (list of segments) or 'soa' (one list per field)"
+    )
+):
     """
     Get YouTube video transcript (detailed format)
     
     Args:
         request: TranscriptRequest with video_id and language
+        raw_format: "aos" for a list of segment objects (default), "soa" for
+            {"text": [...], "start": [...], "duration": [...]}
     
     Returns:
         Detailed transcript response with raw segments and timing information
     """
-    success, transcript_text, raw_segments = extract_transcript(
+    success, transcript_text, raw_segments = await extract_transcript_async(
         request.video_id,
         request.language or "en"
     )
     
     if success:
-        # Convert raw segments to proper format
-        formatted_segments = [
-            TranscriptSegment(
-                text=seg["text"],
-                start=seg["start"],
-                duration=seg["duration"]
-            )
-            for seg in raw_segments
-        ]
+        if raw_format == "soa":
+            # Transpose into one list per field in a single pass
+            texts, starts, durations = [], [], []
+            for seg in raw_segments:
+                texts.append(seg["text"])
+                starts.append(seg["start"])
+                durations.append(seg["duration"])
+            raw = {"text": texts, "start": starts, "duration": durations}
+        else:
+            # Segments are already plain dicts; pass them straight to the encoder
+            raw = raw_segments
         
-        return DetailedTranscriptResponse(
-            success=True,
-            videoId=request.video_id,
-            transcript=transcript_text,
-            raw=formatted_segments,
-            language=request.language or "en"
+        return ORJSONResponse(
+            content={
+                "success": True,
+                "videoId": request.video_id,
+                "transcript": transcript_text,
+                "raw": raw,
+                "language": request.language or "en"
+            }
         )
     else:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={
                 "success": False,
@@ -264,29 +551,21 @@ async def get_transcript_with_timestamps(
     Returns:
         Transcript segments with start/end times in both seconds and formatted strings (HH:MM:SS.mmm)
     """
-    success, _, raw_segments = extract_transcript(video_id, lang)
+    success, _, raw_segments = await extract_transcript_async(video_id, lang)
     
     if success:
-        # Convert raw segments to timestamped format
-        timestamped_segments = [
-            TimestampedSegment(
-                text=seg["text"],
-                start=seg["start"],
-                end=seg["start"] + seg["duration"],
-                startFormatted=format_timestamp(seg["start"]),
-                endFormatted=format_timestamp(seg["start"] + seg["duration"])
-            )
-            for seg in raw_segments
-        ]
+        timestamped_segments = build_timestamped_segments(raw_segments)
         
-        return TimestampedTranscriptResponse(
-            success=True,
-            videoId=video_id,
-            segments=timestamped_segments,
-            language=lang
+        return ORJSONResponse(
+            content={
+                "success": True,
+                "videoId": video_id,
+                "segments": timestamped_segments,
+                "language": lang
+            }
         )
     else:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={
                 "success": False,
@@ -297,6 +576,70 @@ async def get_transcript_with_timestamps(
         )
 
 
+@app.post("/transcripts", response_model=BatchTranscriptResponse)
+async def get_transcripts_batch(request: BatchTranscriptRequest):
+    """
+    Get transcripts for multiple YouTube videos concurrently
+    
+    Args:
+        request: BatchTranscriptRequest with video_ids, language and concurrency
+    
+    Returns:
+        Per-video results in request order; a failed video does not fail the batch
+    """
+    language = request.language or "en"
+    semaphore = asyncio.Semaphore(request.concurrency)
+    
+    outcomes = await asyncio.gather(
+        *[_extract_bounded(semaphore, video_id, language) for video_id in request.video_ids],
+        return_exceptions=True
+    )
+    
+    results = []
+    for video_id, outcome in zip(request.video_ids, outcomes):
+        if isinstance(outcome, Exception):
+            logger.warning("Error fetching transcript for video %s: %s", video_id, outcome)
+            results.append(BatchTranscriptItem(
+                success=False,
+                videoId=video_id,
+                transcript=None,
+                hasTranscript=False,
+                error=str(outcome)
+            ))
+            continue
+        
+        success, transcript_text, _ = outcome
+        results.append(BatchTranscriptItem(
+            success=success,
+            videoId=video_id,
+            transcript=transcript_text,
+            hasTranscript=success,
+            error=None if success else "Transcript not available"
+        ))
+    
+    return BatchTranscriptResponse(
+        success=all(item.success for item in results),
+        results=results,
+        language=language
+    )
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Transcript cache statistics for monitoring
+    """
+    return get_cache_stats()
+
+
+@app.post("/cache/clear")
+async def cache_clear():
+    """
+    Clear the transcript cache
+    """
+    return {"cleared": clear_transcript_cache()}
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -310,12 +653,25 @@ async def root():
             "health": "/health",
             "simple_transcript": "/transcript/{video_id}?lang=en",
             "detailed_transcript": "/transcript (POST)",
-            "timestamped_transcript": "/transcript/{video_id}/timestamps?lang=en"
+            "timestamped_transcript": "/transcript/{video_id}/timestamps?lang=en",
+            "batch_transcripts": "/transcripts (POST)",
+            "cache_stats": "/cache/stats",
+            "cache_clear": "/cache/clear (POST)"
         }
     }
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # loop/http "auto" pick uvloop and httptools when installed (see requirements.txt)
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        access_log=os.getenv("ACCESS_LOG", "0") == "1",
+        loop="auto",
+        http="auto",
+        log_level=os.getenv("LOG_LEVEL", "warning")
+    )
 
@@ -1,80 +1,262 @@
 """
 Shared test fixtures and mocks for YouTube Transcript Service tests
 """
+import asyncio
+import json
+import logging
+import httpx
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import Mock, MagicMock
-from typing import List, Dict, Any
-import os
+from unittest.mock import patch
+from pathlib import Path
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, NamedTuple, Optional, Tuple, Union
+import time
 
+from youtube_transcript_api import FetchedTranscript, FetchedTranscriptSnippet
+# Re-exported for test modules: from tests.conftest import TranscriptsDisabled, ...
+from youtube_transcript_api._errors import (
+    TranscriptsDisabled,
+    NoTranscriptFound,
+    VideoUnavailable,
+    InvalidVideoId
+)
+
+import app as app_module
 from app import app
 
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
-@pytest.fixture
-def client():
+
+@pytest.fixture(scope="session", autouse=True)
+def silence_app_logs():
     """
-    FastAPI TestClient for making HTTP requests to the API
+    Mute the app logger so expected error-path warnings skip formatting and stderr
     """
-    return TestClient(app)
+    logger = logging.getLogger(app_module.__name__)
+    level, propagate = logger.level, logger.propagate
+    logger.setLevel(logging.CRITICAL)
+    logger.propagate = False
+    yield
+    logger.setLevel(level)
+    logger.propagate = propagate
 
 
-@pytest.fixture
-def sample_transcript_data() -> List[Dict[str, Any]]:
+@pytest.fixture(scope="session", name="app_module")
+def app_module_fixture():
+    """
+    The imported app module, for tests that swap its attributes with monkeypatch.setattr
+    """
+    return app_module
+
+
+@pytest.fixture(autouse=True)
+def reset_cached_api():
+    """
+    Drop the shared YouTubeTranscriptApi instance so each test builds its own
+    """
+    app_module._CACHED_API = None
+    yield
+    app_module._CACHED_API = None
+
+
+@pytest.fixture(autouse=True)
+def clear_transcript_cache():
+    """
+    Start every test with an empty transcript cache
+    """
+    app_module.clear_transcript_cache()
+    yield
+    app_module.clear_transcript_cache()
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """
+    One event loop for the whole session so the shared client can outlive a test
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """
+    Async HTTP client calling the ASGI app in-process (no sockets, no thread hop)
+    Shared across the whole session
+    Unhandled app exceptions come back as 500 responses instead of being re-raised
+    """
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
+        yield test_client
+
+
+async def get_json(client: httpx.AsyncClient, url: str) -> Tuple[httpx.Response, Any]:
+    """
+    GET url and decode the body once with orjson, the app's own JSON encoder
+    Returns (response, data)
+    """
+    response = await client.get(url)
+    return response, orjson.loads(response.content)
+
+
+class FakeFetched:
+    """
+    Minimal FetchedTranscript stand-in exposing only to_raw_data()
+    """
+    __slots__ = ("_data",)
+    
+    def __init__(self, data):
+        self._data = data
+    
+    def to_raw_data(self):
+        return self._data
+
+
+class FakeAPI:
+    """
+    Lightweight YouTubeTranscriptApi stand-in (a plain class, far cheaper than a Mock chain)
+    fetch() raises `result` if it is an exception, returns it if it is a fetched
+    transcript, and otherwise wraps it as raw segments in a FakeFetched
+    Every fetch is recorded in `calls` as (video_id, languages tuple)
+    """
+    __slots__ = ("_result", "_raises", "calls")
+    
+    def __init__(self, result):
+        self._raises = isinstance(result, BaseException) or (isinstance(result, type) and issubclass(result, BaseException))
+        if not self._raises and not hasattr(result, "to_raw_data"):
+            result = FakeFetched(result)
+        self._result = result
+        self.calls = []
+    
+    def fetch(self, video_id, languages=("en",)):
+        self.calls.append((video_id, tuple(languages)))
+        if self._raises:
+            raise self._result
+        return self._result
+
+
+class Transcript(NamedTuple):
+    """
+    Segments bundled with their joined text, computed once
+    joined_bytes is the UTF-8 text for assertions against raw response bodies
+    """
+    segments: Tuple[Mapping[str, Any], ...]
+    text: str
+    joined_bytes: bytes
+
+
+def _joined(segments: Tuple[Mapping[str, Any], ...]) -> Transcript:
+    """
+    Bundle segments with their " "-joined text
+    """
+    text = " ".join(seg["text"] for seg in segments)
+    return Transcript(segments=segments, text=text, joined_bytes=text.encode("utf-8"))
+
+
+def _freeze(segments: List[Dict[str, Any]]) -> Tuple[Mapping[str, Any], ...]:
+    """
+    Make session-scoped segment data read-only so no test can mutate it
+    """
+    return tuple(MappingProxyType(seg) for seg in segments)
+
+
+@pytest.fixture(scope="session")
+def transcript_fixtures() -> Dict[str, Tuple[Mapping[str, Any], ...]]:
+    """
+    Canonical transcript payloads from tests/fixtures/*.json, keyed by file name
+    Read from disk once per session
+    """
+    return {
+        path.stem: _freeze(json.loads(path.read_text(encoding="utf-8")))
+        for path in sorted(FIXTURES_DIR.glob("*.json"))
+    }
+
+
+@pytest.fixture(scope="session")
+def sample_transcript_data(transcript_fixtures) -> Tuple[Mapping[str, Any], ...]:
     """
     Sample transcript data for testing
-    Returns a list of transcript segments
+    Returns a read-only tuple of transcript segments
     """
-    return [
-        {"text": "Hello", "start": 0.0, "duration": 1.5},
-        {"text": "world", "start": 1.5, "duration": 1.0},
-        {"text": "this is a test", "start": 2.5, "duration": 2.0}
-    ]
+    return transcript_fixtures["english"]
 
 
 @pytest.fixture
-def sample_transcript_long() -> List[Dict[str, Any]]:
+def sample_fetched_transcript(sample_transcript_data) -> FetchedTranscript:
     """
-    Longer transcript data for testing performance
+    Real FetchedTranscript built from sample_transcript_data
+    Supports both iteration over snippets and to_raw_data()
     """
-    return [
+    return FetchedTranscript(
+        snippets=[FetchedTranscriptSnippet(**seg) for seg in sample_transcript_data],
+        video_id="test_video",
+        language="English",
+        language_code="en",
+        is_generated=False
+    )
+
+
+def _numbered_segments(count: int) -> Tuple[Mapping[str, Any], ...]:
+    """
+    Read-only "Segment i" transcript, one second per segment
+    """
+    return _freeze([
         {"text": f"Segment {i}", "start": float(i), "duration": 1.0}
-        for i in range(100)
-    ]
+        for i in range(count)
+    ])
 
 
-@pytest.fixture
-def sample_transcript_spanish() -> List[Dict[str, Any]]:
+@pytest.fixture(scope="session")
+def sample_transcript_long() -> Tuple[Mapping[str, Any], ...]:
+    """
+    Longer transcript data for testing performance
+    """
+    return _numbered_segments(100)
+
+
+@pytest.fixture(scope="session")
+def sample_transcript_xl() -> Tuple[Mapping[str, Any], ...]:
+    """
+    Stress transcript (10,000 segments) for end-to-end performance tests
+    """
+    return _numbered_segments(10000)
+
+
+@pytest.fixture(scope="session")
+def sample_transcript_xl_joined(sample_transcript_xl) -> Transcript:
+    """
+    sample_transcript_xl with its joined text and UTF-8 bytes, built once per session
+    """
+    return _joined(sample_transcript_xl)
+
+
+@pytest.fixture(scope="session")
+def sample_transcript_spanish(transcript_fixtures) -> Tuple[Mapping[str, Any], ...]:
     """
     Spanish transcript data for language testing
     """
-    return [
-        {"text": "Hola", "start": 0.0, "duration": 1.0},
-        {"text": "mundo", "start": 1.0, "duration": 1.0},
-        {"text": "esto es una prueba", "start": 2.0, "duration": 2.0}
-    ]
+    return transcript_fixtures["spanish"]
 
 
-@pytest.fixture
-def sample_transcript_unicode() -> List[Dict[str, Any]]:
+@pytest.fixture(scope="session")
+def sample_transcript_unicode(transcript_fixtures) -> Tuple[Mapping[str, Any], ...]:
     """
     Transcript with unicode characters and emojis
     """
-    return [
-        {"text": "Hello 👋", "start": 0.0, "duration": 1.0},
-        {"text": "世界", "start": 1.0, "duration": 1.0},
-        {"text": "Привет", "start": 2.0, "duration": 1.0}
-    ]
+    return transcript_fixtures["unicode"]
 
 
 @pytest.fixture
-def mock_youtube_api():
+def patch_api():
     """
-    Mock YouTubeTranscriptApi instance for testing
+    Patch app.get_api_instance and time.sleep for direct extract_transcript tests
+    Yields (get_api_instance mock, sleep mock); set return_value/side_effect on the first
     """
-    mock_api = Mock()
-    mock_fetched = Mock()
-    mock_api.fetch.return_value = mock_fetched
-    return mock_api, mock_fetched
+    with patch.object(app_module, "get_api_instance") as mock_get_api, \
+         patch.object(time, "sleep") as mock_sleep:
+        yield mock_get_api, mock_sleep
 
 
 @pytest.fixture
@@ -112,29 +294,77 @@ def mock_env_with_proxy_locations(monkeypatch):
 
 
 @pytest.fixture
-def mock_successful_extraction(monkeypatch, sample_transcript_data):
+def proxy_env(request, monkeypatch) -> Tuple[str, str, str]:
     """
-    Mock extract_transcript to return successful response
+    Set (WEBSHARE_PROXY_USERNAME, WEBSHARE_PROXY_PASSWORD, PROXY_LOCATIONS) from
+    indirect parametrization (defaults to all empty, i.e. no proxy)
+    Usage: @pytest.mark.parametrize("proxy_env", [("user", "pass", "us")], indirect=True)
+    Returns the tuple that was set
+    """
+    username, password, locations = getattr(request, "param", ("", "", ""))
+    monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", username)
+    monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", password)
+    monkeypatch.setenv("PROXY_LOCATIONS", locations)
+    return username, password, locations
+
+
+@pytest.fixture
+def stub_extraction(monkeypatch):
     """
-    def mock_extract(video_id: str, language: str = "en"):
-        transcript_text = " ".join([seg["text"] for seg in sample_transcript_data])
-        return True, transcript_text, sample_transcript_data
+    Factory: patch extract_transcript to succeed with the given segments
+    If only_language is set, requests for any other language fail
+    Pass a Transcript (e.g. sample_transcript_xl_joined) to reuse its precomputed text
+    Returns the list of languages the endpoint requested
+    """
+    def _stub(segments: Union[List[Dict[str, Any]], Transcript], only_language: Optional[str] = None) -> List[str]:
+        languages = []
+        transcript = segments if isinstance(segments, Transcript) else _joined(segments)
+        
+        def mock_extract(video_id: str, language: str = "en", need_raw: bool = True):
+            languages.append(language)
+            if only_language is not None and language != only_language:
+                return False, None, None
+            return True, transcript.text, transcript.segments
+        
+        monkeypatch.setattr(app_module, "extract_transcript", mock_extract)
+        return languages
     
-    import app
-    monkeypatch.setattr(app, "extract_transcript", mock_extract)
+    return _stub
+
+
+@pytest.fixture
+def mock_successful_extraction(stub_extraction, sample_transcript_data):
+    """
+    Mock extract_transcript to return successful response
+    """
+    # Endpoints hand raw segments to the JSON encoder, so give them plain dicts
+    stub_extraction([dict(seg) for seg in sample_transcript_data])
     return sample_transcript_data
 
 
+@pytest.fixture
+def extract_stub(request, stub_extraction, sample_transcript_data):
+    """
+    Install stub_extraction up front with segments from indirect parametrization
+    (defaults to sample_transcript_data)
+    Usage: @pytest.mark.parametrize("extract_stub", [segments], indirect=True)
+    Returns the list of languages the endpoint requested
+    """
+    segments = getattr(request, "param", None)
+    if segments is None:
+        segments = [dict(seg) for seg in sample_transcript_data]
+    return stub_extraction(segments)
+
+
 @pytest.fixture
 def mock_failed_extraction(monkeypatch):
     """
     Mock extract_transcript to return failed response
     """
-    def mock_extract(video_id: str, language: str = "en"):
+    def mock_extract(video_id: str, language: str = "en", need_raw: bool = True):
         return False, None, None
     
-    import app
-    monkeypatch.setattr(app, "extract_transcript", mock_extract)
+    monkeypatch.setattr(app_module, "extract_transcript", mock_extract)
 
 
 @pytest.fixture
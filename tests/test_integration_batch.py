@@ -0,0 +1,132 @@
+"""
+Integration tests for POST /transcripts endpoint
+Tests the batch transcript endpoint with concurrent fan-out
+"""
+import asyncio
+import pytest
+
+import app as app_module
+
+BATCH_URL = "/transcripts"
+
+
+@pytest.mark.integration
+class TestBatchTranscriptEndpoint:
+    """Test POST /transcripts endpoint"""
+    
+    async def test_all_videos_succeed(self, client, mock_successful_extraction):
+        """Test 1: All videos succeed returns results in request order"""
+        request_body = {
+            "video_ids": ["vid1", "vid2", "vid3"],
+            "language": "en"
+        }
+        
+        response = await client.post(BATCH_URL, json=request_body)
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data["success"] is True
+        assert data["language"] == "en"
+        assert [item["videoId"] for item in data["results"]] == ["vid1", "vid2", "vid3"]
+        
+        for item in data["results"]:
+            assert item["success"] is True
+            assert item["hasTranscript"] is True
+            assert item["transcript"] == "Hello world this is a test"
+            assert item["error"] is None
+    
+    async def test_partial_failure_does_not_fail_batch(self, client, monkeypatch):
+        """Test 2: Missing and erroring videos are reported per item"""
+        def mock_extract(video_id: str, language: str = "en", need_raw: bool = True):
+            if video_id == "missing":
+                return False, None, None
+            if video_id == "broken":
+                raise TimeoutError("Request timed out")
+            return True, "ok", [{"text": "ok", "start": 0.0, "duration": 1.0}]
+        
+        monkeypatch.setattr(app_module, "extract_transcript", mock_extract)
+        
+        response = await client.post(BATCH_URL, json={"video_ids": ["good", "missing", "broken"]})
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data["success"] is False
+        good, missing, broken = data["results"]
+        
+        assert good["success"] is True
+        assert good["transcript"] == "ok"
+        
+        assert missing["success"] is False
+        assert missing["transcript"] is None
+        assert missing["error"] == "Transcript not available"
+        
+        assert broken["success"] is False
+        assert broken["hasTranscript"] is False
+        assert "timed out" in broken["error"]
+    
+    async def test_language_defaults_to_en(self, client, extract_stub):
+        """Test 3: Language defaults to 'en' and is passed to every fetch"""
+        response = await client.post(BATCH_URL, json={"video_ids": ["vid1", "vid2"]})
+        
+        assert response.status_code == 200
+        assert response.json()["language"] == "en"
+        assert extract_stub == ["en", "en"]
+    
+    async def test_concurrency_is_bounded(self, client, monkeypatch):
+        """Test 4: No more than the requested number of fetches run at once"""
+        in_flight = 0
+        peak = 0
+        
+        async def mock_extract_async(video_id: str, language: str = "en", need_raw: bool = True):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return True, "test", []
+        
+        monkeypatch.setattr(app_module, "extract_transcript_async", mock_extract_async)
+        
+        request_body = {
+            "video_ids": [f"vid{i}" for i in range(8)],
+            "concurrency": 2
+        }
+        response = await client.post(BATCH_URL, json=request_body)
+        
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 8
+        assert peak == 2
+    
+    async def test_empty_video_list(self, client):
+        """Test 5: Empty video list returns an empty result set"""
+        response = await client.post(BATCH_URL, json={"video_ids": []})
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data["success"] is True
+        assert data["results"] == []
+    
+    async def test_missing_video_ids(self, client):
+        """Test 6: Missing video_ids returns 422 validation error"""
+        response = await client.post(BATCH_URL, json={"language": "en"})
+        
+        assert response.status_code == 422
+    
+    async def test_oversized_batch_rejected(self, client, extract_stub):
+        """Test 7: More than MAX_BATCH_SIZE video_ids returns 422 without fetching"""
+        video_ids = [f"vid{i}" for i in range(app_module.MAX_BATCH_SIZE + 1)]
+        response = await client.post(BATCH_URL, json={"video_ids": video_ids})
+        
+        assert response.status_code == 422
+        assert extract_stub == []
+    
+    @pytest.mark.parametrize("concurrency", [0, -1, app_module.MAX_BATCH_CONCURRENCY + 1])
+    async def test_out_of_range_concurrency_rejected(self, client, extract_stub, concurrency):
+        """Test 8: Concurrency outside 1..MAX_BATCH_CONCURRENCY returns 422 without fetching"""
+        response = await client.post(BATCH_URL, json={"video_ids": ["vid1"], "concurrency": concurrency})
+        
+        assert response.status_code == 422
+        assert extract_stub == []
@@ -0,0 +1,62 @@
+"""
+Integration tests for the /cache endpoints
+Tests cache statistics and invalidation
+"""
+import pytest
+
+from tests.conftest import FakeAPI, get_json
+
+TRANSCRIPT_URL = "/transcript/dQw4w9WgXcQ"
+CACHE_STATS_URL = "/cache/stats"
+
+
+@pytest.mark.integration
+class TestCacheEndpoints:
+    """Test GET /cache/stats and POST /cache/clear endpoints"""
+    
+    async def test_cache_stats_schema(self, client):
+        """Test 1: Cache stats returns counters and configuration"""
+        response, data = await get_json(client, CACHE_STATS_URL)
+        
+        assert response.status_code == 200
+        
+        # Verify all fields present
+        assert data["hits"] == 0
+        assert data["misses"] == 0
+        assert data["size"] == 0
+        assert data["maxsize"] > 0
+        assert data["ttl"] > 0
+    
+    async def test_cache_stats_after_repeated_request(self, client, sample_fetched_transcript, patch_api):
+        """Test 2: Repeated transcript request is counted as a cache hit"""
+        mock_api = FakeAPI(sample_fetched_transcript)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        await client.get(TRANSCRIPT_URL)
+        await client.get(TRANSCRIPT_URL)
+        
+        _, data = await get_json(client, CACHE_STATS_URL)
+        
+        assert data["hits"] == 1
+        assert data["misses"] == 1
+        assert data["size"] == 1
+        assert mock_api.calls == [("dQw4w9WgXcQ", ("en",))]
+    
+    async def test_cache_clear(self, client, sample_fetched_transcript, patch_api):
+        """Test 3: Clearing the cache reports removed entries"""
+        mock_api = FakeAPI(sample_fetched_transcript)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        await client.get(TRANSCRIPT_URL)
+        
+        response = await client.post("/cache/clear")
+        
+        assert response.status_code == 200
+        assert response.json() == {"cleared": 1}
+        
+        _, data = await get_json(client, CACHE_STATS_URL)
+        assert data["size"] == 0
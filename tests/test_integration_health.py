@@ -3,26 +3,29 @@ Integration tests for GET /health endpoint
 Tests the health check endpoint
 """
 import pytest
-import time
+
+import app as app_module
+from tests.conftest import get_json
+
+HEALTH_URL = "/health"
 
 
 @pytest.mark.integration
 class TestHealthEndpoint:
     """Test GET /health endpoint"""
     
-    def test_health_endpoint_returns_200(self, client):
+    async def test_health_endpoint_returns_200(self, client):
         """Test 1: Health endpoint returns 200 status"""
-        response = client.get("/health")
+        response = await client.get(HEALTH_URL)
         
         # Verify successful response
         assert response.status_code == 200
     
-    def test_health_endpoint_returns_correct_json(self, client):
+    async def test_health_endpoint_returns_correct_json(self, client):
         """Test 2: Health endpoint returns correct JSON structure"""
-        response = client.get("/health")
+        response, data = await get_json(client, HEALTH_URL)
         
         assert response.status_code == 200
-        data = response.json()
         
         # Verify exact response
         assert data == {"status": "healthy"}
@@ -31,28 +34,22 @@ class TestHealthEndpoint:
         assert len(data) == 1
         assert "status" in data
     
-    def test_health_endpoint_works_when_youtube_down(self, client, monkeypatch):
+    async def test_health_endpoint_works_when_youtube_down(self, client, monkeypatch):
         """Test 3: Health endpoint works even when YouTube API is down"""
         # Mock YouTube API to be unavailable
-        def mock_failing_extract(video_id: str, language: str = "en"):
+        def mock_failing_extract(video_id: str, language: str = "en", need_raw: bool = True):
             raise Exception("YouTube API is down")
         
-        import app
-        monkeypatch.setattr(app, "extract_transcript", mock_failing_extract)
+        monkeypatch.setattr(app_module, "extract_transcript", mock_failing_extract)
         
         # Health check should still work (doesn't depend on external services)
-        response = client.get("/health")
+        response, data = await get_json(client, HEALTH_URL)
         
         assert response.status_code == 200
-        data = response.json()
         assert data["status"] == "healthy"
     
-    def test_health_endpoint_is_fast(self, client):
-        """Test 4: Health endpoint responds quickly (< 100ms)"""
-        start_time = time.time()
-        response = client.get("/health")
-        elapsed_time = time.time() - start_time
+    def test_health_endpoint_is_fast(self, benchmark, client, event_loop):
+        """Test 4: Health endpoint latency, timed by pytest-benchmark"""
+        response = benchmark(lambda: event_loop.run_until_complete(client.get(HEALTH_URL)))
         
-        # Should be very fast
         assert response.status_code == 200
-        assert elapsed_time < 0.1  # Less than 100ms
@@ -0,0 +1,48 @@
+"""
+Unit tests for build_timestamped_segments() function
+Tests end-time calculation and timestamp formatting without the HTTP layer
+"""
+import pytest
+from app import build_timestamped_segments
+
+
+@pytest.mark.unit
+class TestBuildTimestampedSegments:
+    """Test the build_timestamped_segments helper function"""
+    
+    def test_segment_fields(self):
+        """Test 1: Segment has text, start/end and formatted start/end"""
+        result = build_timestamped_segments([{"text": "Test", "start": 125.5, "duration": 3540.0}])
+        
+        assert result == [{
+            "text": "Test",
+            "start": 125.5,
+            "end": 3665.5,
+            "startFormatted": "00:02:05.500",
+            "endFormatted": "01:01:05.500"
+        }]
+    
+    def test_order_preserved(self, sample_transcript_data):
+        """Test 2: Output segments keep input order"""
+        result = build_timestamped_segments(sample_transcript_data)
+        
+        assert [seg["text"] for seg in result] == [seg["text"] for seg in sample_transcript_data]
+        assert [seg["end"] for seg in result] == [1.5, 2.5, 4.5]
+    
+    def test_empty_input(self):
+        """Test 3: No segments returns an empty list"""
+        assert build_timestamped_segments([]) == []
+    
+    def test_zero_duration_segment(self):
+        """Test 4: Zero duration segment ends where it starts"""
+        result = build_timestamped_segments([{"text": "instant", "start": 5.0, "duration": 0.0}])
+        
+        assert result[0]["end"] == 5.0
+        assert result[0]["endFormatted"] == result[0]["startFormatted"] == "00:00:05.000"
+    
+    def test_negative_start_time(self):
+        """Test 5: Negative start time passes through without validation"""
+        result = build_timestamped_segments([{"text": "test", "start": -5.0, "duration": 2.0}])
+        
+        assert result[0]["start"] == -5.0
+        assert result[0]["end"] == -3.0
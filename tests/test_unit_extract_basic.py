@@ -2,40 +2,46 @@
 Unit tests for extract_transcript() basic functionality
 Tests core extraction logic without retry mechanisms
 """
+import asyncio
+import threading
+import time
 import pytest
-from unittest.mock import patch, Mock, MagicMock
-from youtube_transcript_api._errors import (
+from unittest.mock import patch
+
+from tests.conftest import (
+    FakeAPI,
     TranscriptsDisabled,
     NoTranscriptFound,
     VideoUnavailable,
     InvalidVideoId
 )
 
+import app as app_module
+from app import extract_transcript, extract_transcript_async
+
 
 @pytest.mark.unit
 class TestExtractTranscriptBasic:
     """Test extract_transcript() basic functionality"""
     
-    def test_successful_extraction_first_attempt(self, sample_transcript_data):
+    def test_successful_extraction_first_attempt(self, sample_transcript_data, patch_api):
         """Test 1: Successful extraction on first attempt"""
-        mock_api = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api.fetch.return_value = mock_fetched
-        
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video_id", "en")
-            
-            # Verify successful extraction
-            assert success is True
-            assert text == "Hello world this is a test"
-            assert raw == sample_transcript_data
-            
-            # Verify API called exactly once (no retries)
-            mock_api.fetch.assert_called_once_with("test_video_id", languages=["en"])
+        mock_api = FakeAPI(sample_transcript_data)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        success, text, raw = extract_transcript("test_video_id", "en")
+        
+        # Verify successful extraction
+        assert success is True
+        assert text == "Hello world this is a test"
+        assert raw == sample_transcript_data
+        
+        # Verify API called exactly once (no retries)
+        assert mock_api.calls == [("test_video_id", ("en",))]
     
-    def test_transcript_with_multiple_segments(self):
+    def test_transcript_with_multiple_segments(self, patch_api):
         """Test 2: Transcript with multiple segments joined correctly"""
         segments = [
             {"text": "seg1", "start": 0.0, "duration": 1.0},
@@ -45,19 +51,17 @@ class TestExtractTranscriptBasic:
             {"text": "seg5", "start": 4.0, "duration": 1.0}
         ]
         
-        mock_api = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = segments
-        mock_api.fetch.return_value = mock_fetched
+        mock_api = FakeAPI(segments)
         
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify text joined with single space
-            assert text == "seg1 seg2 seg3 seg4 seg5"
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        success, text, raw = extract_transcript("test_video", "en")
+        
+        # Verify text joined with single space
+        assert text == "seg1 seg2 seg3 seg4 seg5"
     
-    def test_transcript_with_empty_segment(self):
+    def test_transcript_with_empty_segment(self, patch_api):
         """Test 3: Transcript with empty segment text"""
         segments = [
             {"text": "Hello", "start": 0.0, "duration": 1.0},
@@ -65,135 +69,138 @@ class TestExtractTranscriptBasic:
             {"text": "world", "start": 2.0, "duration": 1.0}
         ]
         
-        mock_api = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = segments
-        mock_api.fetch.return_value = mock_fetched
+        mock_api = FakeAPI(segments)
         
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Empty string included in join
-            assert success is True
-            assert text == "Hello  world"  # Double space where empty segment was
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        success, text, raw = extract_transcript("test_video", "en")
+        
+        # Empty string included in join
+        assert success is True
+        assert text == "Hello  world"  # Double space where empty segment was
     
-    def test_alternative_language_spanish(self, sample_transcript_spanish):
+    def test_alternative_language_spanish(self, sample_transcript_spanish, patch_api):
         """Test 4: Extract transcript in Spanish"""
-        mock_api = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_spanish
-        mock_api.fetch.return_value = mock_fetched
-        
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "es")
-            
-            # Verify Spanish transcript
-            assert success is True
-            assert text == "Hola mundo esto es una prueba"
-            
-            # Verify API called with Spanish language
-            mock_api.fetch.assert_called_once_with("test_video", languages=["es"])
+        mock_api = FakeAPI(sample_transcript_spanish)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        success, text, raw = extract_transcript("test_video", "es")
+        
+        # Verify Spanish transcript
+        assert success is True
+        assert text == "Hola mundo esto es una prueba"
+        
+        # Verify API called with Spanish language
+        assert mock_api.calls == [("test_video", ("es",))]
     
-    def test_transcripts_disabled_exception(self):
-        """Test 5: TranscriptsDisabled exception returns failure immediately"""
-        mock_api = Mock()
-        mock_api.fetch.side_effect = TranscriptsDisabled("test_video")
-        
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify failure response
-            assert success is False
-            assert text is None
-            assert raw is None
+    @pytest.mark.parametrize("exc", [
+        TranscriptsDisabled("test_video"),
+        NoTranscriptFound("test_video", ["en"], []),
+        VideoUnavailable("test_video"),
+        InvalidVideoId("test_video"),
+    ], ids=lambda exc: type(exc).__name__)
+    def test_api_exception_returns_failure(self, exc, patch_api):
+        """Test 5: Known API exceptions return failure immediately"""
+        mock_api = FakeAPI(exc)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        assert extract_transcript("test_video", "en") == (False, None, None)
     
-    def test_no_transcript_found_exception(self):
-        """Test 6: NoTranscriptFound exception returns failure immediately"""
-        mock_api = Mock()
-        mock_api.fetch.side_effect = NoTranscriptFound(
-            "test_video", ["en"], []
-        )
-        
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify failure response
-            assert success is False
-            assert text is None
-            assert raw is None
+    def test_transcript_with_special_characters(self, sample_transcript_unicode, patch_api):
+        """Test 6: Transcript with emojis and unicode preserved"""
+        mock_api = FakeAPI(sample_transcript_unicode)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        success, text, raw = extract_transcript("test_video", "en")
+        
+        # Verify special characters preserved
+        assert success is True
+        assert "👋" in text
+        assert "世界" in text
+        assert "Привет" in text
     
-    def test_video_unavailable_exception(self):
-        """Test 7: VideoUnavailable exception returns failure immediately"""
-        mock_api = Mock()
-        mock_api.fetch.side_effect = VideoUnavailable("test_video")
-        
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify failure response
-            assert success is False
-            assert text is None
-            assert raw is None
+    def test_long_transcript_correct(self, sample_transcript_long, patch_api):
+        """Test 7: Long transcript (100 segments) is extracted intact"""
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = FakeAPI(sample_transcript_long)
+        
+        success, text, raw = extract_transcript("test_video", "en")
+        
+        assert success is True
+        assert len(raw) == 100
+        assert text == " ".join(seg["text"] for seg in sample_transcript_long)
     
-    def test_invalid_video_id_exception(self):
-        """Test 8: InvalidVideoId exception returns failure immediately"""
-        mock_api = Mock()
-        mock_api.fetch.side_effect = InvalidVideoId("invalid_id")
-        
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("invalid_id", "en")
-            
-            # Verify failure response
-            assert success is False
-            assert text is None
-            assert raw is None
+    @pytest.mark.slow
+    def test_very_long_transcript_performance(self, benchmark, sample_transcript_xl, patch_api):
+        """Test 8: Very long transcript (10,000 segments), timed by pytest-benchmark"""
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = FakeAPI(sample_transcript_xl)
+        
+        def uncached_args():
+            # Clear the transcript cache so every round does a real extraction
+            app_module.clear_transcript_cache()
+            return ("test_video", "en"), {}
+        
+        success, text, raw = benchmark.pedantic(extract_transcript, setup=uncached_args, rounds=20)
+        
+        assert success is True
+        assert len(raw) == 10000
     
-    def test_transcript_with_special_characters(self, sample_transcript_unicode):
-        """Test 9: Transcript with emojis and unicode preserved"""
-        mock_api = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_unicode
-        mock_api.fetch.return_value = mock_fetched
-        
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify special characters preserved
-            assert success is True
-            assert "👋" in text
-            assert "世界" in text
-            assert "Привет" in text
+    async def test_async_wrapper_matches_sync_result(self, sample_transcript_data, patch_api):
+        """Test 9: extract_transcript_async returns the same tuple off the event loop"""
+        mock_api = FakeAPI(sample_transcript_data)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        success, text, raw = await extract_transcript_async("test_video", "en")
+        
+        assert success is True
+        assert text == "Hello world this is a test"
+        assert raw == sample_transcript_data
     
-    def test_very_long_transcript_performance(self):
-        """Test 10: Very long transcript (1000 segments) performs acceptably"""
-        import time
+    async def test_async_fetches_bounded_by_yt_concurrency(self, monkeypatch):
+        """Test 10: No more than YT_CONCURRENCY fetches run at the same time"""
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
         
-        # Create 1000 segments
-        segments = [
-            {"text": f"Segment {i}", "start": float(i), "duration": 1.0}
-            for i in range(1000)
-        ]
+        def mock_extract(video_id: str, language: str = "en", need_raw: bool = True):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return True, "test", []
         
-        mock_api = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = segments
-        mock_api.fetch.return_value = mock_fetched
+        monkeypatch.setattr(app_module, "extract_transcript", mock_extract)
+        monkeypatch.setattr(app_module, "_YT_SEMAPHORE", asyncio.Semaphore(2))
         
-        with patch('app.get_api_instance', return_value=mock_api):
-            from app import extract_transcript
-            
-            start_time = time.time()
-            success, text, raw = extract_transcript("test_video", "en")
-            elapsed_time = time.time() - start_time
+        results = await asyncio.gather(*[extract_transcript_async(f"vid{i}") for i in range(6)])
+        
+        assert len(results) == 6
+        assert peak == 2
+    
+    def test_text_only_extraction_skips_raw_segments(self, sample_fetched_transcript, patch_api):
+        """Test 11: need_raw=False joins snippet text without building raw segments"""
+        mock_api = FakeAPI(sample_fetched_transcript)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        with patch.object(type(sample_fetched_transcript), 'to_raw_data') as mock_to_raw:
+            success, text, raw = extract_transcript("test_video", "en", need_raw=False)
             
-            # Verify success and performance
             assert success is True
-            assert len(raw) == 1000
-            assert elapsed_time < 1.0  # Should complete in under 1 second
+            assert text == "Hello world this is a test"
+            assert raw is None
+            mock_to_raw.assert_not_called()
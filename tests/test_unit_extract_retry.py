@@ -7,251 +7,117 @@ These tests are written following TDD (Test-Driven Development) principles.
 They will FAIL until retry logic is added to the extract_transcript() function.
 """
 import pytest
-from unittest.mock import patch, Mock, call
-import time
+
+from app import extract_transcript
+from tests.conftest import FakeAPI, VideoUnavailable
 
 
 @pytest.mark.unit
+@pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
 class TestExtractTranscriptRetry:
     """Test extract_transcript() retry logic (TDD - to be implemented)"""
     
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_success_after_one_retry(self, sample_transcript_data):
-        """Test 1: Success after 1 retry"""
-        mock_api_1 = Mock()
-        mock_api_1.fetch.side_effect = Exception("429 Too Many Requests")
-        
-        mock_api_2 = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_2.fetch.return_value = mock_fetched
-        
-        with patch('app.get_api_instance', side_effect=[mock_api_1, mock_api_2]), \
-             patch('time.sleep') as mock_sleep:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify success after retry
-            assert success is True
+    @pytest.mark.parametrize("error, failures, succeeds, expected_sleeps", [
+        ("429 Too Many Requests", 1, True, 1),
+        ("429", 3, True, 3),
+        ("429", 4, True, 4),                  # success on last (5th) attempt
+        ("429 Rate Limited", 5, False, 4),    # 5 attempts = 4 sleeps, then give up
+        ("too many requests", 1, True, 1),
+        ("Too Many Requests", 1, True, 1),    # match is case-insensitive
+        ("Error 429: Rate limited", 1, True, 1),
+    ], ids=[
+        "success_after_one_retry", "success_after_three_retries", "success_on_last_attempt",
+        "all_attempts_fail", "too_many_lowercase", "too_many_capitalized", "429_anywhere",
+    ])
+    def test_retry_matrix(self, error, failures, succeeds, expected_sleeps, sample_transcript_data, patch_api):
+        """Test 1: Rate-limit errors are retried with a sleep between attempts"""
+        apis = [FakeAPI(Exception(error))] * failures
+        if succeeds:
+            apis.append(FakeAPI(sample_transcript_data))
+        
+        mock_get_api, mock_sleep = patch_api
+        mock_get_api.side_effect = apis
+        
+        success, text, raw = extract_transcript("test_video", "en")
+        
+        assert success is succeeds
+        if succeeds:
             assert text == "Hello world this is a test"
-            
-            # Verify sleep called once
-            assert mock_sleep.call_count == 1
-    
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_success_after_three_retries(self, sample_transcript_data):
-        """Test 2: Success after 3 retries"""
-        mock_api_fail = Mock()
-        mock_api_fail.fetch.side_effect = Exception("429")
-        
-        mock_api_success = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_success.fetch.return_value = mock_fetched
-        
-        with patch('app.get_api_instance', 
-                   side_effect=[mock_api_fail, mock_api_fail, mock_api_fail, mock_api_success]), \
-             patch('time.sleep') as mock_sleep:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify success
-            assert success is True
-            
-            # Verify 3 sleep calls (3 retries)
-            assert mock_sleep.call_count == 3
-    
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_success_on_last_attempt(self, sample_transcript_data):
-        """Test 3: Success on last (5th) attempt"""
-        mock_api_fail = Mock()
-        mock_api_fail.fetch.side_effect = Exception("429")
-        
-        mock_api_success = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_success.fetch.return_value = mock_fetched
-        
-        # 4 failures, then success on 5th attempt
-        with patch('app.get_api_instance',
-                   side_effect=[mock_api_fail, mock_api_fail, mock_api_fail, 
-                               mock_api_fail, mock_api_success]), \
-             patch('time.sleep') as mock_sleep:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify success on last attempt
-            assert success is True
-            assert mock_sleep.call_count == 4
-    
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_all_attempts_fail(self):
-        """Test 4: All 5 attempts fail"""
-        mock_api = Mock()
-        mock_api.fetch.side_effect = Exception("429 Rate Limited")
-        
-        with patch('app.get_api_instance', return_value=mock_api), \
-             patch('time.sleep') as mock_sleep:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify failure after max retries
-            assert success is False
+        else:
             assert text is None
             assert raw is None
-            
-            # Verify max retries attempted (5 attempts = 4 sleeps)
-            assert mock_sleep.call_count == 4
+        assert mock_sleep.call_count == expected_sleeps
     
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_error_message_too_many_lowercase(self, sample_transcript_data):
-        """Test 5: Error message with 'too many' (lowercase) triggers retry"""
-        mock_api_fail = Mock()
-        mock_api_fail.fetch.side_effect = Exception("too many requests")
+    def test_non_retryable_error_after_retry(self, patch_api):
+        """Test 2: Non-retryable error after retries stops immediately"""
+        mock_api_1 = FakeAPI(Exception("429"))
+        mock_api_2 = FakeAPI(VideoUnavailable("test_video"))
         
-        mock_api_success = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_success.fetch.return_value = mock_fetched
+        mock_get_api, mock_sleep = patch_api
+        mock_get_api.side_effect = [mock_api_1, mock_api_2]
         
-        with patch('app.get_api_instance', side_effect=[mock_api_fail, mock_api_success]), \
-             patch('time.sleep'):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify retry was triggered
-            assert success is True
-    
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_error_message_too_many_capitalized(self, sample_transcript_data):
-        """Test 6: Error message with 'Too Many' (capitalized) triggers retry"""
-        mock_api_fail = Mock()
-        mock_api_fail.fetch.side_effect = Exception("Too Many Requests")
+        success, text, raw = extract_transcript("test_video", "en")
         
-        mock_api_success = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_success.fetch.return_value = mock_fetched
+        # Verify failure (no more retries after non-retryable error)
+        assert success is False
         
-        with patch('app.get_api_instance', side_effect=[mock_api_fail, mock_api_success]), \
-             patch('time.sleep'):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify retry was triggered (case-insensitive)
-            assert success is True
+        # Only 1 sleep (1 retry before hitting VideoUnavailable)
+        assert mock_sleep.call_count == 1
     
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_error_message_with_429_anywhere(self, sample_transcript_data):
-        """Test 7: Error message with '429' anywhere triggers retry"""
-        mock_api_fail = Mock()
-        mock_api_fail.fetch.side_effect = Exception("Error 429: Rate limited")
-        
-        mock_api_success = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_success.fetch.return_value = mock_fetched
+    def test_retry_delay_configuration(self, sample_transcript_data, monkeypatch, patch_api):
+        """Test 3: Retry delay respects RETRY_DELAY environment variable"""
+        monkeypatch.setenv("RETRY_DELAY", "2.5")
         
-        with patch('app.get_api_instance', side_effect=[mock_api_fail, mock_api_success]), \
-             patch('time.sleep'):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify retry was triggered
-            assert success is True
-    
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_non_retryable_error_after_retry(self):
-        """Test 8: Non-retryable error after retries stops immediately"""
-        from youtube_transcript_api._errors import VideoUnavailable
+        mock_api_fail = FakeAPI(Exception("429"))
+        mock_api_success = FakeAPI(sample_transcript_data)
         
-        mock_api_1 = Mock()
-        mock_api_1.fetch.side_effect = Exception("429")
+        mock_get_api, mock_sleep = patch_api
+        mock_get_api.side_effect = [mock_api_fail, mock_api_success]
         
-        mock_api_2 = Mock()
-        mock_api_2.fetch.side_effect = VideoUnavailable("test_video")
+        success, text, raw = extract_transcript("test_video", "en")
         
-        with patch('app.get_api_instance', side_effect=[mock_api_1, mock_api_2]), \
-             patch('time.sleep') as mock_sleep:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify failure (no more retries after non-retryable error)
-            assert success is False
-            
-            # Only 1 sleep (1 retry before hitting VideoUnavailable)
-            assert mock_sleep.call_count == 1
+        # Verify correct delay used
+        mock_sleep.assert_called_with(2.5)
     
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_retry_delay_configuration(self, sample_transcript_data, monkeypatch):
-        """Test 9: Retry delay respects RETRY_DELAY environment variable"""
-        monkeypatch.setenv("RETRY_DELAY", "2.5")
+    def test_fresh_api_instance_per_retry(self, sample_transcript_data, patch_api):
+        """Test 4: Fresh API instance created per retry (for proxy rotation)"""
+        mock_api_fail = FakeAPI(Exception("429"))
+        mock_api_success = FakeAPI(sample_transcript_data)
         
-        mock_api_fail = Mock()
-        mock_api_fail.fetch.side_effect = Exception("429")
+        mock_get_api, mock_sleep = patch_api
+        mock_get_api.side_effect = [mock_api_fail, mock_api_fail, mock_api_fail, mock_api_success]
         
-        mock_api_success = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_success.fetch.return_value = mock_fetched
+        success, text, raw = extract_transcript("test_video", "en")
         
-        with patch('app.get_api_instance', side_effect=[mock_api_fail, mock_api_success]), \
-             patch('time.sleep') as mock_sleep:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify correct delay used
-            mock_sleep.assert_called_with(2.5)
+        # Verify get_api_instance called 4 times (new instance per attempt)
+        assert mock_get_api.call_count == 4
     
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_fresh_api_instance_per_retry(self, sample_transcript_data):
-        """Test 10: Fresh API instance created per retry (for proxy rotation)"""
-        mock_api_fail = Mock()
-        mock_api_fail.fetch.side_effect = Exception("429")
+    def test_max_retries_configuration(self, monkeypatch, patch_api):
+        """Test 5: MAX_RETRIES environment variable respected"""
+        monkeypatch.setenv("MAX_RETRIES", "3")
         
-        mock_api_success = Mock()
-        mock_fetched = Mock()
-        mock_fetched.to_raw_data.return_value = sample_transcript_data
-        mock_api_success.fetch.return_value = mock_fetched
+        mock_api = FakeAPI(Exception("429"))
         
-        with patch('app.get_api_instance', 
-                   side_effect=[mock_api_fail, mock_api_fail, mock_api_fail, mock_api_success]) as mock_get_instance:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify get_api_instance called 4 times (new instance per attempt)
-            assert mock_get_instance.call_count == 4
-    
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_max_retries_configuration(self, monkeypatch):
-        """Test 11: MAX_RETRIES environment variable respected"""
-        monkeypatch.setenv("MAX_RETRIES", "3")
+        mock_get_api, mock_sleep = patch_api
+        mock_get_api.return_value = mock_api
         
-        mock_api = Mock()
-        mock_api.fetch.side_effect = Exception("429")
+        success, text, raw = extract_transcript("test_video", "en")
         
-        with patch('app.get_api_instance', return_value=mock_api) as mock_get_instance, \
-             patch('time.sleep'):
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify exactly 3 attempts (not default 5)
-            assert mock_get_instance.call_count == 3
+        # Verify exactly 3 attempts (not default 5)
+        assert mock_get_api.call_count == 3
     
-    @pytest.mark.skip(reason="Retry logic not yet implemented in app.py")
-    def test_generic_error_no_retry(self):
-        """Test 12: Generic error without retry markers doesn't retry"""
-        mock_api = Mock()
-        mock_api.fetch.side_effect = Exception("Network error")
+    def test_generic_error_no_retry(self, patch_api):
+        """Test 6: Generic error without retry markers doesn't retry"""
+        mock_api = FakeAPI(Exception("Network error"))
+        
+        mock_get_api, mock_sleep = patch_api
+        mock_get_api.return_value = mock_api
+        
+        success, text, raw = extract_transcript("test_video", "en")
+        
+        # Verify failure without retries
+        assert success is False
         
-        with patch('app.get_api_instance', return_value=mock_api) as mock_get_instance, \
-             patch('time.sleep') as mock_sleep:
-            from app import extract_transcript
-            success, text, raw = extract_transcript("test_video", "en")
-            
-            # Verify failure without retries
-            assert success is False
-            
-            # Only 1 API call (no retries)
-            assert mock_get_instance.call_count == 1
-            assert mock_sleep.call_count == 0
+        # Only 1 API call (no retries)
+        assert mock_get_api.call_count == 1
+        assert mock_sleep.call_count == 0
@@ -3,49 +3,48 @@ Unit tests for format_timestamp() function
 Tests timestamp formatting with various inputs
 """
 import pytest
+from hypothesis import given, strategies as st
+
 from app import format_timestamp
 
+# Shared (seconds, expected) table: checks format_timestamp and the reference below
+TIMESTAMP_CASES = [
+    pytest.param(0.0, "00:00:00.000", id="zero"),
+    pytest.param(45.5, "00:00:45.500", id="under_one_minute"),            # common case for short clips
+    pytest.param(60.0, "00:01:00.000", id="exactly_one_minute"),          # boundary condition
+    pytest.param(125.75, "00:02:05.750", id="minutes_and_seconds"),       # 2 minutes, 5.75 seconds
+    pytest.param(3600.0, "01:00:00.000", id="exactly_one_hour"),          # boundary condition
+    pytest.param(3665.123, "01:01:05.123", id="hours_minutes_seconds"),   # 1 hour, 1 minute, 5.123 seconds
+    pytest.param(7384.5, "02:03:04.500", id="multiple_hours"),            # 2 hours, 3 minutes, 4.5 seconds
+    pytest.param(0.123, "00:00:00.123", id="millisecond_precision"),      # 3 decimal places preserved
+    pytest.param(59.9996, "00:01:00.000", id="rounding_carries_into_minutes"),  # sub-millisecond rounding
+]
+
+
+def _reference_timestamp(seconds: float) -> str:
+    """Integer-millisecond reference implementation of HH:MM:SS.mmm"""
+    hours, rem = divmod(round(seconds * 1000), 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    secs, millis = divmod(rem, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
 
 @pytest.mark.unit
 class TestFormatTimestamp:
     """Test the format_timestamp helper function"""
     
-    def test_zero_seconds(self):
-        """Test 1: Zero seconds should format as 00:00:00.000"""
-        result = format_timestamp(0.0)
-        assert result == "00:00:00.000"
-    
-    def test_under_one_minute(self):
-        """Test 2: Under one minute - common case for short clips"""
-        result = format_timestamp(45.5)
-        assert result == "00:00:45.500"
-    
-    def test_exactly_one_minute(self):
-        """Test 3: Exactly one minute - boundary condition"""
-        result = format_timestamp(60.0)
-        assert result == "00:01:00.000"
-    
-    def test_minutes_and_seconds(self):
-        """Test 4: Minutes and seconds - common case for normal segments"""
-        result = format_timestamp(125.75)  # 2 minutes, 5.75 seconds
-        assert result == "00:02:05.750"
-    
-    def test_exactly_one_hour(self):
-        """Test 5: Exactly one hour - boundary condition"""
-        result = format_timestamp(3600.0)
-        assert result == "01:00:00.000"
-    
-    def test_hours_minutes_seconds(self):
-        """Test 6: Hours, minutes, and seconds - common case for long videos"""
-        result = format_timestamp(3665.123)  # 1 hour, 1 minute, 5.123 seconds
-        assert result == "01:01:05.123"
-    
-    def test_multiple_hours(self):
-        """Test 7: Multiple hours - long video case"""
-        result = format_timestamp(7384.5)  # 2 hours, 3 minutes, 4.5 seconds
-        assert result == "02:03:04.500"
-    
-    def test_millisecond_precision(self):
-        """Test 8: Millisecond precision - verify 3 decimal places preserved"""
-        result = format_timestamp(0.123)
-        assert result == "00:00:00.123"
+    @pytest.mark.parametrize("seconds, expected", TIMESTAMP_CASES)
+    def test_format_timestamp(self, seconds, expected):
+        """Test 1: Seconds format as HH:MM:SS.mmm"""
+        assert format_timestamp(seconds) == expected
+    
+    @pytest.mark.parametrize("seconds, expected", TIMESTAMP_CASES)
+    def test_reference_matches_table(self, seconds, expected):
+        """Test 2: Reference implementation agrees with the hand-written table"""
+        assert _reference_timestamp(seconds) == expected
+    
+    @given(st.floats(min_value=0, max_value=359999.999, allow_nan=False, allow_infinity=False))
+    def test_format_timestamp_matches_reference(self, seconds):
+        """Test 3: Any time under 100 hours formats like the reference"""
+        seconds = round(seconds, 3)
+        assert format_timestamp(seconds) == _reference_timestamp(seconds)
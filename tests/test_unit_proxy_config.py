@@ -2,129 +2,112 @@
 Unit tests for proxy configuration logic
 Tests get_api_instance() with various proxy configurations
 """
+import concurrent.futures
 import pytest
-from unittest.mock import patch, Mock, MagicMock
-import os
+from types import SimpleNamespace
+from unittest.mock import Mock, ANY
+
+from app import get_api_instance, parse_proxy_locations
+
+# Expected filter_ip_locations values, built once; lists because the app passes lists
+_LOC_SINGLE = ["us"]
+_LOC_MULTI = ["us", "de", "gb"]
+_LOC_UPPER = ["us", "de"]
 
 
 @pytest.mark.unit
 class TestProxyConfiguration:
     """Test get_api_instance() proxy configuration"""
     
-    def test_no_proxy_credentials_direct_connection(self, monkeypatch):
-        """Test 1: No proxy credentials should use direct connection"""
-        monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", "")
-        monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", "")
-        monkeypatch.setenv("PROXY_LOCATIONS", "")
-        
-        with patch('app.YouTubeTranscriptApi') as mock_api_class:
-            from app import get_api_instance
-            get_api_instance()
-            
-            # Verify YouTubeTranscriptApi was called without proxy_config
-            mock_api_class.assert_called_once_with()
+    @pytest.fixture(autouse=True)
+    def mocks(self, app_module, monkeypatch):
+        """
+        Swap YouTubeTranscriptApi and WebshareProxyConfig in app for every test
+        Plain Mocks: the tests only inspect calls, so MagicMock's magic methods are not needed
+        """
+        api, proxy = Mock(), Mock()
+        # WebshareProxyConfig's default, so build_api_instance can re-mount its retry adapter
+        proxy.return_value.retries_when_blocked = 10
+        monkeypatch.setattr(app_module, "YouTubeTranscriptApi", api)
+        monkeypatch.setattr(app_module, "WebshareProxyConfig", proxy)
+        return SimpleNamespace(api=api, proxy=proxy)
     
-    def test_with_proxy_credentials(self, monkeypatch):
-        """Test 2: With proxy credentials should create WebshareProxyConfig"""
-        monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", "testuser")
-        monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", "testpass")
-        monkeypatch.setenv("PROXY_LOCATIONS", "")
+    @pytest.mark.parametrize("proxy_env, expected_filter, expects_proxy", [
+        # A missing credential means a direct connection
+        (("", "", ""), None, False),
+        (("testuser", "", ""), None, False),
+        (("", "testpass", ""), None, False),
+        (("testuser", "testpass", ""), None, True),
+        (("testuser", "testpass", "us"), _LOC_SINGLE, True),
+        (("testuser", "testpass", "us,de,gb"), _LOC_MULTI, True),
+        (("testuser", "testpass", " us , de , gb "), _LOC_MULTI, True),   # whitespace stripped
+        (("testuser", "testpass", "US,DE"), _LOC_UPPER, True),            # lowercased
+    ], indirect=["proxy_env"], ids=[
+        "no_credentials", "username_only", "password_only", "with_credentials",
+        "single_location", "multiple_locations", "locations_with_whitespace", "uppercase_locations",
+    ])
+    def test_get_api_instance(self, mocks, proxy_env, expected_filter, expects_proxy):
+        """Test 1: Proxy is used only with both credentials, with normalized location filter"""
+        username, password, _ = proxy_env
         
-        with patch('app.WebshareProxyConfig') as mock_proxy_class, \
-             patch('app.YouTubeTranscriptApi') as mock_api_class:
-            
-            from app import get_api_instance
-            get_api_instance()
-            
-            # Verify WebshareProxyConfig was created with credentials
-            mock_proxy_class.assert_called_once_with(
-                proxy_username="testuser",
-                proxy_password="testpass",
-                filter_ip_locations=None
+        get_api_instance()
+        
+        if expects_proxy:
+            # Verify WebshareProxyConfig was created and handed to YouTubeTranscriptApi
+            mocks.proxy.assert_called_once_with(
+                proxy_username=username,
+                proxy_password=password,
+                filter_ip_locations=expected_filter
             )
-            
-            # Verify YouTubeTranscriptApi was called with proxy_config
-            mock_api_class.assert_called_once()
-            call_kwargs = mock_api_class.call_args[1]
-            assert 'proxy_config' in call_kwargs
+            mocks.api.assert_called_once_with(proxy_config=mocks.proxy.return_value, http_client=ANY)
+        else:
+            # Verify direct connection (no proxy_config)
+            mocks.proxy.assert_not_called()
+            mocks.api.assert_called_once_with(http_client=ANY)
     
-    def test_single_location_filter(self, monkeypatch):
-        """Test 3: Single location filter"""
-        monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", "testuser")
-        monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", "testpass")
-        monkeypatch.setenv("PROXY_LOCATIONS", "us")
+    def test_api_instance_reused_across_calls(self, mocks, proxy_env):
+        """Test 2: API instance is built once and reused for later calls"""
+        first = get_api_instance()
+        second = get_api_instance()
         
-        with patch('app.WebshareProxyConfig') as mock_proxy_class, \
-             patch('app.YouTubeTranscriptApi'):
-            
-            from app import get_api_instance
-            get_api_instance()
-            
-            # Verify filter_ip_locations contains single country
-            mock_proxy_class.assert_called_once()
-            call_kwargs = mock_proxy_class.call_args[1]
-            assert call_kwargs['filter_ip_locations'] == ["us"]
+        # Verify a single instance (and session) is shared
+        assert first is second
+        mocks.api.assert_called_once_with(http_client=ANY)
     
-    def test_multiple_location_filter(self, monkeypatch):
-        """Test 4: Multiple location filter"""
-        monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", "testuser")
-        monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", "testpass")
-        monkeypatch.setenv("PROXY_LOCATIONS", "us,de,gb")
+    def test_api_instance_created_once_under_concurrency(self, mocks, proxy_env):
+        """Test 3: Concurrent first calls share a single API instance"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            instances = list(executor.map(lambda _: get_api_instance(), range(8)))
         
-        with patch('app.WebshareProxyConfig') as mock_proxy_class, \
-             patch('app.YouTubeTranscriptApi'):
-            
-            from app import get_api_instance
-            get_api_instance()
-            
-            # Verify filter_ip_locations contains all countries
-            mock_proxy_class.assert_called_once()
-            call_kwargs = mock_proxy_class.call_args[1]
-            assert call_kwargs['filter_ip_locations'] == ["us", "de", "gb"]
+        # Verify every thread got the same instance
+        assert all(instance is instances[0] for instance in instances)
+        mocks.api.assert_called_once_with(http_client=ANY)
     
-    def test_location_filter_with_whitespace(self, monkeypatch):
-        """Test 5: Location filter with whitespace should strip spaces"""
-        monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", "testuser")
-        monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", "testpass")
-        monkeypatch.setenv("PROXY_LOCATIONS", " us , de , gb ")
-        
-        with patch('app.WebshareProxyConfig') as mock_proxy_class, \
-             patch('app.YouTubeTranscriptApi'):
-            
-            from app import get_api_instance
-            get_api_instance()
-            
-            # Verify whitespace is stripped
-            mock_proxy_class.assert_called_once()
-            call_kwargs = mock_proxy_class.call_args[1]
-            assert call_kwargs['filter_ip_locations'] == ["us", "de", "gb"]
+    def test_location_filter_skips_empty_entries(self):
+        """Test 4: Empty entries in the location list are ignored"""
+        assert parse_proxy_locations("us,,de,") == ["us", "de"]
+        assert parse_proxy_locations(" , ") is None
     
-    def test_location_filter_uppercase_conversion(self, monkeypatch):
-        """Test 6: Location filter should convert to lowercase"""
-        monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", "testuser")
-        monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", "testpass")
-        monkeypatch.setenv("PROXY_LOCATIONS", "US,DE")
+    def test_http_session_pool_sized_to_concurrency(self, app_module, monkeypatch):
+        """Test 5: Shared session's connection pool matches YT_CONCURRENCY"""
+        monkeypatch.setattr(app_module, "YT_CONCURRENCY", 25)
         
-        with patch('app.WebshareProxyConfig') as mock_proxy_class, \
-             patch('app.YouTubeTranscriptApi'):
-            
-            from app import get_api_instance
-            get_api_instance()
-            
-            # Verify converted to lowercase
-            mock_proxy_class.assert_called_once()
-            call_kwargs = mock_proxy_class.call_args[1]
-            assert call_kwargs['filter_ip_locations'] == ["us", "de"]
+        session = app_module.build_http_session()
+        
+        assert session.get_adapter("https://www.youtube.com")._pool_maxsize == 25
+
+
+@pytest.mark.unit
+class TestProxiedHttpSession:
+    """Test the session a real proxied YouTubeTranscriptApi ends up using"""
     
-    def test_only_username_set_no_password(self, monkeypatch):
-        """Test 7: Only username set (no password) should use direct connection"""
-        monkeypatch.setenv("WEBSHARE_PROXY_USERNAME", "testuser")
-        monkeypatch.setenv("WEBSHARE_PROXY_PASSWORD", "")
-        monkeypatch.setenv("PROXY_LOCATIONS", "")
+    @pytest.mark.parametrize("proxy_env", [("testuser", "testpass", "")], indirect=True)
+    def test_proxied_session_pool_sized_to_concurrency(self, app_module, monkeypatch, proxy_env):
+        """Test 1: Proxy mode keeps the YT_CONCURRENCY pool and the library's retry-on-block"""
+        monkeypatch.setattr(app_module, "YT_CONCURRENCY", 25)
         
-        with patch('app.YouTubeTranscriptApi') as mock_api_class:
-            from app import get_api_instance
-            get_api_instance()
-            
-            # Verify direct connection (no proxy_config)
-            mock_api_class.assert_called_once_with()
+        adapter = get_api_instance()._fetcher._http_client.get_adapter("https://www.youtube.com")
+        
+        assert adapter._pool_maxsize == 25
+        assert adapter.max_retries.total == 10
+        assert adapter.max_retries.status_forcelist == [429]
@@ -0,0 +1,107 @@
+"""
+Unit tests for the transcript cache in extract_transcript()
+Tests cache hits, misses and invalidation
+"""
+import asyncio
+import pytest
+
+import app as app_module
+from app import clear_transcript_cache, extract_transcript, extract_transcript_async, get_cache_stats
+
+from tests.conftest import FakeAPI, TranscriptsDisabled
+
+
+@pytest.mark.unit
+class TestTranscriptCache:
+    """Test extract_transcript() caching behaviour"""
+    
+    def test_second_call_served_from_cache(self, sample_transcript_data, patch_api):
+        """Test 1: Repeated request for same video/language hits the cache"""
+        mock_api = FakeAPI(sample_transcript_data)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        first = extract_transcript("test_video", "en")
+        second = extract_transcript("test_video", "en")
+        
+        # Verify identical result with a single upstream fetch
+        assert first == second
+        assert mock_api.calls == [("test_video", ("en",))]
+        
+        stats = get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+    
+    def test_language_is_part_of_cache_key(self, sample_transcript_data, patch_api):
+        """Test 2: Different languages are cached separately"""
+        mock_api = FakeAPI(sample_transcript_data)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        extract_transcript("test_video", "en")
+        extract_transcript("test_video", "es")
+        
+        # Verify both languages fetched from the API
+        assert mock_api.calls == [("test_video", ("en",)), ("test_video", ("es",))]
+    
+    def test_failures_are_not_cached(self, patch_api):
+        """Test 3: Failed fetches are retried on the next request"""
+        mock_api = FakeAPI(TranscriptsDisabled("test_video"))
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        extract_transcript("test_video", "en")
+        success, text, raw = extract_transcript("test_video", "en")
+        
+        # Verify failure returned and nothing stored
+        assert success is False
+        assert mock_api.calls == [("test_video", ("en",))] * 2
+        assert get_cache_stats()["size"] == 0
+    
+    def test_clear_transcript_cache(self, sample_transcript_data, patch_api):
+        """Test 4: Clearing the cache forces a fresh fetch"""
+        mock_api = FakeAPI(sample_transcript_data)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        extract_transcript("test_video", "en")
+        
+        assert clear_transcript_cache() == 1
+        
+        extract_transcript("test_video", "en")
+        assert mock_api.calls == [("test_video", ("en",))] * 2
+    
+    def test_text_only_entry_refetched_for_raw(self, sample_fetched_transcript, sample_transcript_data, patch_api):
+        """Test 5: Text-only cache entry serves text requests but not raw requests"""
+        mock_api = FakeAPI(sample_fetched_transcript)
+        
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = mock_api
+        
+        extract_transcript("test_video", "en", need_raw=False)
+        text_only = extract_transcript("test_video", "en", need_raw=False)
+        full = extract_transcript("test_video", "en")
+        
+        assert text_only == (True, "Hello world this is a test", None)
+        assert full == (True, "Hello world this is a test", [dict(seg) for seg in sample_transcript_data])
+        assert mock_api.calls == [("test_video", ("en",))] * 2
+    
+    async def test_cache_hit_skips_fetch_semaphore(self, sample_transcript_data, monkeypatch, patch_api):
+        """Test 6: A cached transcript is returned while every fetch slot is taken"""
+        mock_get_api, _ = patch_api
+        mock_get_api.return_value = FakeAPI(sample_transcript_data)
+        extract_transcript("test_video", "en")
+        
+        # No free slots: only a path that skips the semaphore can finish
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+        monkeypatch.setattr(app_module, "_YT_SEMAPHORE", semaphore)
+        
+        result = await asyncio.wait_for(extract_transcript_async("test_video", "en"), timeout=1)
+        
+        assert result == (True, "Hello world this is a test", sample_transcript_data)